@@ -9,11 +9,15 @@ def main(argv=None):
     parser.add_argument("--text-cols", nargs="*", help="List of text column names", default=None)
     parser.add_argument("--image-cols", nargs="*", help="List of image column names", default=None)
     parser.add_argument("--out", help="Output HTML report path", default="report.html")
+    parser.add_argument("--no-pixel-stats", action="store_true",
+                        help="Only format/size for images (remote URLs are probed with HTTP Range requests, no full download).")
+    parser.add_argument("--group-by", help="Label column: also profile every group (class) in the same pass", default=None)
     args = parser.parse_args(argv)
 
     df = pd.read_csv(args.csv)
     profiler = MMProfiler(df)
-    profiler.run(text_cols=args.text_cols, image_cols=args.image_cols)
+    profiler.run(text_cols=args.text_cols, image_cols=args.image_cols, image_pixel_stats=not args.no_pixel_stats,
+                 group_by=args.group_by)
     profiler.to_html(args.out)
     print(f"Report written to {args.out}")
 
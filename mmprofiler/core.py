@@ -3,13 +3,14 @@ import os
 import tempfile
 import shutil
 from typing import Optional, Dict, Any, List
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 import pandas as pd
 
-from .detectors_text import analyze_text_column
-from .detectors_image import analyze_image_paths
-from .detectors_numeric import analyze_numeric_column, summarize_numeric_columns
+from .detectors_text import analyze_text_column, analyze_text_by_group
+from .detectors_image import (analyze_image_paths, analyze_image_paths_by_group, probe_image_header, probe_jpeg_segments,
+                              HEADER_PROBE_BYTES, HEADER_PROBE_ROUNDS)
+from .detectors_numeric import analyze_numeric_column, analyze_numeric_by_group, summarize_numeric_columns
 from .detectors_audio import analyze_audio_column
 from .multimodal import multimodal_consistency_checks
 from .report import generate_html_report
@@ -28,14 +29,15 @@ class ProfileResult:
     numeric: Dict[str, Any]
     multimodal: Dict[str, Any]
     recommendations: Dict[str, Any]
+    groups: Dict[str, Any] = field(default_factory=dict)
 
 
 class MMProfiler:
     """
    Profiler:
-      - run(...) — повний прогін (text, image, numeric, audio)
+      - run(...) — повний прогін (text, image, numeric, audio); run(group_by="label") — ще й по кожному класу
       - analyze_text(column)
-      - analyze_images(column, sample_images=...)
+      - analyze_images(column, sample_images=..., pixel_stats=False — лише формат/розміри, Range-запити для URL)
       - analyze_audio(column)
       - analyze_numeric(column)
       - summarize_tabular(...)
@@ -62,8 +64,10 @@ class MMProfiler:
     def analyze_text(self, column_name: str) -> Dict[str, Any]:
         return self._analyze_text_single(column_name)
 
-    def analyze_images(self, column_name: str, sample_images: int = 200, download_remote: bool = True) -> Dict[str, Any]:
-        return self._analyze_images_single(column_name, sample_images=sample_images, download_remote=download_remote)
+    def analyze_images(self, column_name: str, sample_images: int = 200, download_remote: bool = True,
+                       pixel_stats: bool = True) -> Dict[str, Any]:
+        return self._analyze_images_single(column_name, sample_images=sample_images, download_remote=download_remote,
+                                           pixel_stats=pixel_stats)
 
     def analyze_audio(self, column_name: str) -> Dict[str, Any]:
         return self._analyze_audio_single(column_name)
@@ -97,13 +101,75 @@ class MMProfiler:
         return info
     
 
-    def _analyze_images_single(self, column_name: str, sample_images: int = 200, download_remote: bool = True) -> Dict[str, Any]:
+    def _fetch_range(self, url: str, start: int):
+        """
+        Range-запит на HEADER_PROBE_BYTES байтів з зсуву start.
+        Повертає (дані, чи віддав сервер саме діапазон — 206).
+        """
+        import requests
+        r = requests.get(url, headers={"Range": f"bytes={start}-{start + HEADER_PROBE_BYTES - 1}"}, timeout=6, stream=True)
+        try:
+            r.raise_for_status()
+            # 200 — сервер ігнорує Range, тоді читаємо лише початок потоку і рвемо з'єднання
+            data = b""
+            for chunk in r.iter_content(chunk_size=HEADER_PROBE_BYTES):
+                data += chunk
+                if len(data) >= HEADER_PROBE_BYTES:
+                    break
+        finally:
+            r.close()
+        return data[:HEADER_PROBE_BYTES], r.status_code == 206
+
+    def _probe_remote_header(self, url: str):
+        """
+        Тягне лише перші HEADER_PROBE_BYTES байтів (Range-запит) і читає з них
+        формат та розміри. Якщо SOF у JPEG лежить далі (великий EXIF/мініатюра),
+        докачує потрібний сегмент ще до HEADER_PROBE_ROUNDS Range-запитами.
+        Повертає ((format, width, height) або None, к-сть байтів).
+        """
+        data, ranged = self._fetch_range(url, 0)
+        n = len(data)
+        header = probe_image_header(data)
+        if header is None and ranged and data[:2] == b"\xff\xd8":
+            found = probe_jpeg_segments(data)
+            for _ in range(HEADER_PROBE_ROUNDS):
+                if not isinstance(found, int):
+                    break
+                chunk, ranged = self._fetch_range(url, found)
+                n += len(chunk)
+                found = probe_jpeg_segments(chunk, base=found) if ranged and chunk else None
+            if isinstance(found, tuple):
+                header = found
+        return header, n
+
+    def _analyze_images_single(self, column_name: str, sample_images: int = 200, download_remote: bool = True,
+                               pixel_stats: bool = True, groups: Optional[pd.Series] = None) -> Dict[str, Any]:
         # prepare local series (detectors_image supports local paths)
         series = self.df[column_name] if column_name in self.df.columns else pd.Series(dtype=object)
+        local_paths: List[str] = []
+        remote_headers = []
+        # group labels aligned with local_paths / remote_headers (only when groups is given)
+        local_groups: List[str] = []
+        header_groups: List[str] = []
+        # with groups the overall sample stays exactly the ungrouped one (first sample_images files);
+        # on top of it every group gets a stratified quota, so sorted data does not starve later groups
+        local_overall: List[bool] = []
+        header_overall: List[bool] = []
+        overall_taken = 0
+        group_taken: Dict[str, int] = {}
+        full_groups = 0
+        n_groups = groups.nunique() if groups is not None else 0
+        quota = max(1, sample_images // n_groups) if n_groups and sample_images is not None else None
+        bytes_downloaded = 0
 
         for i, v in enumerate(series.fillna("").astype(str)):
             if not v:
                 continue
+            label = groups.iloc[i] if groups is not None else None
+            in_overall = sample_images is None or overall_taken < sample_images
+            in_quota = label is not None and (quota is None or group_taken.get(label, 0) < quota)
+            if not (in_overall or in_quota):
+                continue
             if v.lower().startswith("http://") or v.lower().startswith("https://"):
                 if not download_remote:
                     continue
@@ -111,30 +177,64 @@ class MMProfiler:
                     import requests
                 except Exception:
                     return {"error": "requests not installed (needed to download image URLs). Install with pip install requests."}
-       
-                self._ensure_tmp()
-                try:
-                    r = requests.get(v, timeout=6)
-                    r.raise_for_status()
-                    ext = os.path.splitext(v.split("?")[0])[1] or ".jpg"
-                    fname = f"img_{i}{ext}"
-                    local_path = os.path.join(self._tmp_dir, fname)
-                    with open(local_path, "wb") as f:
-                        f.write(r.content)
-                    local_paths.append(local_path)
-                except Exception:
-                    # skip broken url
-                    continue
+
+                # metadata-only: format/size from the first bytes, full GET only if the header does not fit
+                header = None
+                if not pixel_stats:
+                    try:
+                        header, n = self._probe_remote_header(v)
+                        bytes_downloaded += n
+                    except Exception:
+                        continue
+                if header is not None:
+                    remote_headers.append(header)
+                    if groups is not None:
+                        header_groups.append(label)
+                        header_overall.append(in_overall)
+                else:
+                    self._ensure_tmp()
+                    try:
+                        r = requests.get(v, timeout=6)
+                        r.raise_for_status()
+                        bytes_downloaded += len(r.content)
+                        ext = os.path.splitext(v.split("?")[0])[1] or ".jpg"
+                        fname = f"img_{i}{ext}"
+                        local_path = os.path.join(self._tmp_dir, fname)
+                        with open(local_path, "wb") as f:
+                            f.write(r.content)
+                        local_paths.append(local_path)
+                        if groups is not None:
+                            local_groups.append(label)
+                            local_overall.append(in_overall)
+                    except Exception:
+                        # skip broken url
+                        continue
             else:
                 if os.path.exists(v):
                     local_paths.append(v)
+                    if groups is not None:
+                        local_groups.append(label)
+                        local_overall.append(in_overall)
                 else:
                     continue
-            if sample_images is not None and len(local_paths) >= sample_images:
+            if in_overall:
+                overall_taken += 1
+            if in_quota:
+                group_taken[label] = group_taken.get(label, 0) + 1
+                if group_taken[label] == quota:
+                    full_groups += 1
+            if sample_images is not None and overall_taken >= sample_images and full_groups == n_groups:
                 break
 
         try:
-            img_info = analyze_image_paths(pd.Series(local_paths))
+            if groups is None:
+                img_info = analyze_image_paths(pd.Series(local_paths, dtype=object), pixel_stats=pixel_stats, headers=remote_headers)
+            else:
+                img_info, by_group = analyze_image_paths_by_group(
+                    local_paths, local_groups, pixel_stats=pixel_stats, headers=remote_headers, header_groups=header_groups,
+                    overall=local_overall + header_overall)
+                img_info["by_group"] = by_group
+            img_info["bytes_downloaded"] = bytes_downloaded
         except Exception as e:
             img_info = {"error": str(e)}
         # cleanup tmp files
@@ -217,7 +317,15 @@ class MMProfiler:
             numeric_cols: Optional[List[str]] = None,
             audio_cols: Optional[List[str]] = None,
             sample_images: int = 50,
-            download_remote_images: bool = True) -> ProfileResult:
+            download_remote_images: bool = True,
+            image_pixel_stats: bool = True,
+            group_by: Optional[str] = None) -> ProfileResult:
+        """
+        group_by — колонка з мітками (напр. "label"): текстові, числові та
+        image-метрики рахуються ще й по кожній групі в тому ж проході
+        (результат у ProfileResult.groups). Загальна image-вибірка та сама, що й
+        без group_by; кожна група додатково отримує max(1, sample_images // K) файлів.
+        """
 
         if text_cols is None:
             text_cols = [c for c in self.df.columns if self.df[c].dtype == object]
@@ -234,8 +342,24 @@ class MMProfiler:
         audio_report = {}
         numeric_report = {}
 
+        groups = None
+        group_report: Dict[str, Dict[str, Any]] = {"text": {}, "images": {}, "numeric": {}}
+        if group_by is not None:
+            if group_by not in self.df.columns:
+                raise KeyError(f"group_by column '{group_by}' not found in dataframe")
+            groups = self.df[group_by].fillna("NULL").astype(str)
+
+        # per-group failures must not replace the global profile of a column
+        group_errors: Dict[str, Dict[str, str]] = {"text": {}, "numeric": {}}
+
         # text
         for col in text_cols:
+            if groups is not None and col != group_by:
+                try:
+                    text_report[col], group_report["text"][col] = analyze_text_by_group(self.df[col], groups)
+                    continue
+                except Exception as e:
+                    group_errors["text"][col] = str(e)
             try:
                 text_report[col] = analyze_text_column(self.df[col])
             except Exception as e:
@@ -243,7 +367,10 @@ class MMProfiler:
 
         # image
         for col in image_cols:
-            image_report[col] = self._analyze_images_single(col, sample_images=sample_images, download_remote=download_remote_images)
+            image_report[col] = self._analyze_images_single(col, sample_images=sample_images, download_remote=download_remote_images,
+                                                           pixel_stats=image_pixel_stats, groups=groups)
+            if "by_group" in image_report[col]:
+                group_report["images"][col] = image_report[col].pop("by_group")
 
         # audio
         for col in audio_cols:
@@ -255,12 +382,25 @@ class MMProfiler:
               numeric_report[col] = self.analyze_numeric(col)
            except Exception as e:
               numeric_report[col] = {"error": str(e)}
+           if groups is not None and col != group_by:
+              try:
+                  group_report["numeric"][col] = analyze_numeric_by_group(self.df[col], groups)
+              except Exception as e:
+                  group_errors["numeric"][col] = str(e)
+
+        group_section: Dict[str, Any] = {}
+        if groups is not None:
+            group_section = self._make_group_section(group_by, groups, group_report,
+                                                     text_report, image_report, numeric_report)
+            group_section["errors"] = {m: errs for m, errs in group_errors.items() if errs}
 
         # multimodal checks
         mm_checks = multimodal_consistency_checks(self.df, text_cols=text_cols, image_cols=image_cols)
 
         # recommendations
         recs = self._make_recommendations(text_report, image_report, mm_checks, numeric_report, audio_report)
+        if any(group_section.get("flags", {}).values()):
+            recs["multimodal"].append(f"Деякі групи '{group_by}' сильно відрізняються від загального профілю — див. розділ per-group.")
 
         self.result = ProfileResult(
             general=general,
@@ -269,7 +409,8 @@ class MMProfiler:
             audio=audio_report,
             numeric=numeric_report,
             multimodal=mm_checks,
-            recommendations=recs
+            recommendations=recs,
+            groups=group_section
         )
         return self.result
 
@@ -279,6 +420,63 @@ class MMProfiler:
         generate_html_report(self.result, output_file)
         return output_file
 
+    # Per-group section
+    def _make_group_section(self, group_by, groups, group_report, text_report, image_report, numeric_report):
+        per_group: Dict[str, Any] = {g: {"rows": int(n), "text": {}, "images": {}, "numeric": {}}
+                                     for g, n in groups.value_counts().items()}
+        for modality, cols in group_report.items():
+            for col, by_group in cols.items():
+                for g, info in by_group.items():
+                    per_group[g][modality][col] = info
+        # groups with rows but nothing in the image sample stay visible instead of silently losing the section
+        for col, info in image_report.items():
+            if "error" in info:
+                continue
+            for sections in per_group.values():
+                sections["images"].setdefault(col, {"sampled": False})
+
+        flags: Dict[str, List[str]] = {}
+        for g, sections in per_group.items():
+            s = []
+            # text: довжина та частка пустих рядків
+            for col, info in sections["text"].items():
+                overall = text_report.get(col, {})
+                if overall.get("avg_length") and not 0.5 <= info["avg_length"] / overall["avg_length"] <= 2:
+                    s.append(f"text '{col}': середня довжина {info['avg_length']} проти {overall['avg_length']} загалом.")
+                empty_diff = 100 * (info["empty_rows"] / max(1, info["total"]) - overall.get("empty_rows", 0) / max(1, overall.get("total", 0)))
+                if abs(empty_diff) > 20:
+                    s.append(f"text '{col}': частка пустих рядків відрізняється на {empty_diff:+.1f} п.п.")
+            # numeric: зсув середнього (>1 std) та пропуски
+            for col, info in sections["numeric"].items():
+                overall = numeric_report.get(col, {})
+                if info["mean"] is not None and overall.get("mean") is not None and overall.get("std"):
+                    z = (info["mean"] - overall["mean"]) / overall["std"]
+                    if abs(z) > 1:
+                        s.append(f"numeric '{col}': середнє {info['mean']:.2f} проти {overall['mean']:.2f} загалом ({z:+.1f} std).")
+                if abs(info["missing_percent"] - overall.get("missing_percent", 0)) > 20:
+                    s.append(f"numeric '{col}': пропусків {info['missing_percent']}% проти {overall.get('missing_percent')}% загалом.")
+            # images: розміри, яскравість, биті файли
+            for col, info in sections["images"].items():
+                if info.get("sampled") is False:
+                    s.append(f"images '{col}': у вибірці немає жодного зображення цієї групи (порожні шляхи або недоступні файли).")
+                    continue
+                overall = image_report.get(col, {})
+                for key in ("avg_width", "avg_height"):
+                    if info.get(key) and overall.get(key) and not 0.5 <= info[key] / overall[key] <= 2:
+                        s.append(f"images '{col}': {key} {info[key]} проти {overall[key]} загалом.")
+                if info.get("avg_brightness") is not None and overall.get("avg_brightness") is not None \
+                        and abs(info["avg_brightness"] - overall["avg_brightness"]) > 30:
+                    s.append(f"images '{col}': яскравість {info['avg_brightness']} проти {overall['avg_brightness']} загалом.")
+                total = info["valid_files"] + info["missing_files"] + info["broken_files"]
+                overall_total = overall.get("valid_files", 0) + overall.get("missing_files", 0) + overall.get("broken_files", 0)
+                if total and overall_total:
+                    bad_diff = 100 * ((total - info["valid_files"]) / total - (overall_total - overall["valid_files"]) / overall_total)
+                    if bad_diff > 20:
+                        s.append(f"images '{col}': невалідних файлів більше на {bad_diff:.1f} п.п.")
+            flags[g] = s
+
+        return {"group_by": group_by, "groups": per_group, "flags": flags}
+
     # Recommendations
     def _make_recommendations(self, text_report, image_report, mm_checks, numeric_report, audio_report):
         recs: Dict[str, Any] = {"text": {}, "images": {}, "multimodal": [], "numeric": {}, "audio": {}}
@@ -1,7 +1,97 @@
+import io
+import struct
+from typing import Optional, Tuple, Union
+
 from PIL import Image
 import numpy as np
 
-def analyze_image_paths(series):
+# скільки байтів з початку файлу тягнемо Range-запитом для читання заголовка
+HEADER_PROBE_BYTES = 8192
+# скільки додаткових Range-запитів дозволено, щоб дійти до SOF у JPEG з великим EXIF
+HEADER_PROBE_ROUNDS = 4
+
+# SOF-маркери JPEG (окрім DHT/JPG/DAC), у яких лежать розміри кадру
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def probe_jpeg_segments(data: bytes, base: int = 0) -> Union[Tuple[str, int, int], int, None]:
+    """
+    Сканує сегменти JPEG у шматку data, що лежить у файлі з зсуву base
+    (base=0 — початок файлу з SOI, інакше — початок сегмента).
+    Повертає (format, width, height), якщо SOF знайдено; int — абсолютний
+    зсув, з якого треба докачати байти; None — дані не схожі на JPEG.
+    """
+    i = 2 if base == 0 else 0
+    while i + 9 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:
+            i += 1
+            continue
+        if marker in _JPEG_SOF:
+            h, w = struct.unpack(">HH", data[i + 5:i + 9])
+            return "JPEG", w, h
+        if marker == 0xD8 or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+        i += 2 + struct.unpack(">H", data[i + 2:i + 4])[0]
+    return base + i
+
+
+def _probe_webp(data: bytes):
+    chunk = data[12:16]
+    if chunk == b"VP8 " and len(data) >= 30:
+        w, h = struct.unpack("<HH", data[26:30])
+        return "WEBP", w & 0x3FFF, h & 0x3FFF
+    if chunk == b"VP8L" and len(data) >= 25:
+        bits = struct.unpack("<I", data[21:25])[0]
+        return "WEBP", (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X" and len(data) >= 30:
+        w = int.from_bytes(data[24:27], "little") + 1
+        h = int.from_bytes(data[27:30], "little") + 1
+        return "WEBP", w, h
+    return None
+
+
+def probe_image_header(data: bytes) -> Optional[Tuple[str, int, int]]:
+    """
+    Читає формат і розміри з перших байтів файлу (JPEG/PNG/WebP/GIF),
+    без декодування пікселів. Повертає (format, width, height) або None,
+    якщо заголовок не вміщується в data.
+    """
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and len(data) >= 24:
+        w, h = struct.unpack(">II", data[16:24])
+        return "PNG", w, h
+    if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        w, h = struct.unpack("<HH", data[6:10])
+        return "GIF", w, h
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return _probe_webp(data)
+    if data[:2] == b"\xff\xd8":
+        found = probe_jpeg_segments(data)
+        return found if isinstance(found, tuple) else None
+    # інші формати — пробуємо Pillow на тому ж префіксі
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            return img.format, img.width, img.height
+    except Exception:
+        return None
+
+
+def _read_image(path, pixel_stats: bool):
+    """Один файл -> (status, format, width, height, brightness)."""
+    try:
+        with Image.open(path) as img:
+            bright = np.array(img).mean() if pixel_stats else None
+            return "valid", img.format, img.width, img.height, bright
+    except FileNotFoundError:
+        return "missing", None, None, None, None
+    except Exception:
+        return "broken", None, None, None, None
+
+
+def _summarize_images(records):
     valid_count = 0
     missing_count = 0
     broken_count = 0
@@ -10,18 +100,19 @@ def analyze_image_paths(series):
     heights = []
     brightness = []
 
-    for path in series:
-        try:
-            with Image.open(path) as img:
-                valid_count += 1
-                formats[img.format] = formats.get(img.format, 0) + 1
-                widths.append(img.width)
-                heights.append(img.height)
-                brightness.append(np.array(img).mean())
-        except FileNotFoundError:
+    for status, fmt, w, h, bright in records:
+        if status == "missing":
             missing_count += 1
-        except Exception:
+            continue
+        if status == "broken":
             broken_count += 1
+            continue
+        valid_count += 1
+        formats[fmt] = formats.get(fmt, 0) + 1
+        widths.append(w)
+        heights.append(h)
+        if bright is not None:
+            brightness.append(bright)
 
     result = {
         "valid_files": valid_count,
@@ -40,3 +131,36 @@ def analyze_image_paths(series):
         "avg_brightness": round(float(np.mean(brightness)), 2) if brightness else None
     }
     return result
+
+
+def analyze_image_paths(series, pixel_stats: bool = True, headers=None):
+    """
+    series — локальні шляхи; headers — вже прочитані probe_image_header
+    (format, width, height) для віддалених зображень. При pixel_stats=False
+    пікселі не декодуються, brightness лишається порожнім.
+    """
+    records = [_read_image(path, pixel_stats) for path in series]
+    records += [("valid", fmt, w, h, None) for fmt, w, h in headers or []]
+    return _summarize_images(records)
+
+
+def analyze_image_paths_by_group(series, groups, pixel_stats: bool = True, headers=None, header_groups=None,
+                                 overall=None):
+    """
+    Як analyze_image_paths, але кожен файл читається один раз і результати
+    розкладаються по групах (groups / header_groups — мітки, вирівняні з
+    series / headers). overall — прапорці (спершу series, потім headers),
+    які файли входять у загальну вибірку; None — усі. Групові метрики
+    рахуються з усіх файлів групи. Повертає (overall, {група: метрики}).
+    """
+    records = [_read_image(path, pixel_stats) for path in series]
+    records += [("valid", fmt, w, h, None) for fmt, w, h in headers or []]
+    keys = list(groups) + list(header_groups or [])
+    if overall is None:
+        overall = [True] * len(records)
+
+    by_group = {}
+    for key, rec in zip(keys, records):
+        by_group.setdefault(str(key), []).append(rec)
+    overall_records = [rec for rec, flag in zip(records, overall) if flag]
+    return _summarize_images(overall_records), {key: _summarize_images(recs) for key, recs in by_group.items()}
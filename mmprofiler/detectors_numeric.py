@@ -38,3 +38,43 @@ def summarize_numeric_columns(df):
         if pd.api.types.is_numeric_dtype(df[col]):
             result[col] = analyze_numeric_column(df[col])
     return result
+
+def analyze_numeric_by_group(series: pd.Series, groups: pd.Series) -> Dict[str, Dict[str, Any]]:
+    """
+    Ті самі метрики, що й analyze_numeric_column, для кожної групи
+    (groups — мітки, вирівняні з series) — одним groupby-проходом.
+    """
+    s = pd.to_numeric(series, errors="coerce")
+    # describe() на bool не дає mean/квантилів — як і в analyze_numeric_column, лишаємо їх None
+    is_bool = pd.api.types.is_bool_dtype(s)
+    if is_bool:
+        s = s.astype(float)
+    g = s.groupby(groups)
+    agg = g.agg(["count", "size", "mean", "std", "min", "max", "skew"])
+    quant = g.quantile([0.25, 0.5, 0.75]).unstack()
+    zeros = (s == 0).groupby(groups).sum()
+
+    def _f(v):
+        return None if is_bool or pd.isna(v) else float(v)
+
+    result = {}
+    for key, row in agg.iterrows():
+        count = int(row["count"])
+        total = int(row["size"])
+        missing = total - count
+        result[str(key)] = {
+            "count": count,
+            "total": total,
+            "missing": missing,
+            "missing_percent": round(missing / max(1, total) * 100, 2),
+            "zeros": int(zeros.get(key, 0)),
+            "mean": _f(row["mean"]),
+            "std": _f(row["std"]),
+            "min": _f(row["min"]),
+            "25%": _f(quant.at[key, 0.25]),
+            "50%": _f(quant.at[key, 0.5]),
+            "75%": _f(quant.at[key, 0.75]),
+            "max": _f(row["max"]),
+            "skew": None if count < 3 or pd.isna(row["skew"]) else float(row["skew"])
+        }
+    return result
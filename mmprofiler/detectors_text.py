@@ -1,7 +1,9 @@
 import re
 from collections import Counter
 import statistics
-from typing import Any, Dict, Iterable
+from typing import Any, Dict, Iterable, Tuple
+
+import pandas as pd
 
 def simple_tokenize(s: str):
     return [t.lower() for t in re.findall(r"[A-Za-zА-Яа-яЇїІіЄєҐґ0-9]+", s)]
@@ -27,3 +29,64 @@ def analyze_text_column(series) -> Dict[str, Any]:
         "avg_tokens": round(statistics.mean(token_counts), 2) if token_counts else 0,
         "top_words": top
     }
+
+def analyze_text_by_group(series, groups) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    """
+    Ті самі метрики, що й analyze_text_column, для всієї колонки і для кожної
+    групи (groups — мітки, вирівняні з series). Текст токенізується один раз,
+    далі — groupby-агрегації. Повертає (overall, {група: метрики}).
+    """
+    texts = series.fillna("").astype(str)
+    tokens = texts.map(simple_tokenize)
+    frame = pd.DataFrame({
+        "group": groups.values,
+        "length": texts.str.len().values,
+        "empty": (texts.str.strip() == "").values,
+        "tokens": tokens.str.len().values
+    })
+    agg = frame.groupby("group").agg(
+        total=("length", "size"),
+        empty_rows=("empty", "sum"),
+        avg_length=("length", "mean"),
+        min_length=("length", "min"),
+        max_length=("length", "max"),
+        avg_tokens=("tokens", "mean")
+    )
+    words = pd.DataFrame({"group": groups.values, "word": tokens.values}).explode("word").dropna()
+    # stable sort keeps first-seen order on ties, as Counter.most_common does
+    top = (words.groupby(["group", "word"], sort=False).size()
+           .sort_values(ascending=False, kind="stable")
+           .groupby(level=0).head(10))
+    top_words = {}
+    for (key, w), c in top.items():
+        top_words.setdefault(key, []).append((w, int(c)))
+
+    result = {}
+    for key, row in agg.iterrows():
+        total = int(row["total"])
+        empty = int(row["empty_rows"])
+        result[str(key)] = {
+            "total": total,
+            "non_empty": total - empty,
+            "empty_rows": empty,
+            "avg_length": round(float(row["avg_length"]), 2),
+            "min_length": int(row["min_length"]),
+            "max_length": int(row["max_length"]),
+            "avg_tokens": round(float(row["avg_tokens"]), 2),
+            "top_words": top_words.get(key, [])
+        }
+
+    words_all = Counter()
+    for t in tokens:
+        words_all.update(t)
+    overall = {
+        "total": len(frame),
+        "non_empty": len(frame) - int(frame["empty"].sum()),
+        "empty_rows": int(frame["empty"].sum()),
+        "avg_length": round(float(frame["length"].mean()), 2) if len(frame) else 0,
+        "min_length": int(frame["length"].min()) if len(frame) else 0,
+        "max_length": int(frame["length"].max()) if len(frame) else 0,
+        "avg_tokens": round(float(frame["tokens"].mean()), 2) if len(frame) else 0,
+        "top_words": words_all.most_common(10)
+    }
+    return overall, result
@@ -41,6 +41,7 @@ HTML_TEMPLATE = """<!doctype html>
     <pre>{numeric}</pre>
   </div>
 
+{groups_section}
   <div class="card">
     <h2>Multimodal checks</h2>
     <pre>{multimodal}</pre>
@@ -55,6 +56,36 @@ HTML_TEMPLATE = """<!doctype html>
 </html>
 """
 
+GROUP_TEMPLATE = """  <div class="card">
+    <h2>Per-group analysis ({group_by})</h2>
+    <h3>Flags (groups that differ from the global profile)</h3>
+    <pre>{flags}</pre>
+{groups}  </div>
+"""
+
+GROUP_ITEM_TEMPLATE = """    <h3>{name} ({rows} rows)</h3>
+    <pre>{body}</pre>
+"""
+
+def render_groups_section(groups) -> str:
+    """groups: ProfileResult.groups; порожній рядок, якщо run() був без group_by"""
+    if not groups:
+        return ""
+    items = "".join(
+        GROUP_ITEM_TEMPLATE.format(
+            name=html.escape(str(name)),
+            rows=info.get("rows", 0),
+            body=html.escape(json.dumps({k: v for k, v in info.items() if k != "rows"}, ensure_ascii=False, indent=2))
+        )
+        for name, info in groups.get("groups", {}).items()
+    )
+    flags = {g: f for g, f in groups.get("flags", {}).items() if f}
+    return GROUP_TEMPLATE.format(
+        group_by=html.escape(str(groups.get("group_by"))),
+        flags=html.escape(json.dumps(flags, ensure_ascii=False, indent=2)),
+        groups=items
+    )
+
 def generate_html_report(result, out_path="report.html"):
     """result: instance of ProfileResult (dataclass) or dict-like"""
     # Normalize dataclass or dict
@@ -65,7 +96,8 @@ def generate_html_report(result, out_path="report.html"):
             "images": getattr(result, "images", {}),
             "numeric": getattr(result, "numeric", {}),
             "multimodal": getattr(result, "multimodal", {}),
-            "recs": getattr(result, "recommendations", {}) or {}
+            "recs": getattr(result, "recommendations", {}) or {},
+            "groups": getattr(result, "groups", {}) or {}
         }
     else:
         # assume dict-like
@@ -75,7 +107,8 @@ def generate_html_report(result, out_path="report.html"):
             "images": result.get("images", {}),
             "numeric": result.get("numeric", {}),
             "multimodal": result.get("multimodal", {}),
-            "recs": result.get("recommendations", {}) or result.get("recs", {})
+            "recs": result.get("recommendations", {}) or result.get("recs", {}),
+            "groups": result.get("groups", {}) or {}
         }
 
     general = json.dumps(data["general"], ensure_ascii=False, indent=2)
@@ -91,7 +124,8 @@ def generate_html_report(result, out_path="report.html"):
         images=html.escape(images),
         numeric=html.escape(numeric),
         multimodal=html.escape(multimodal),
-        recs=html.escape(recs)
+        recs=html.escape(recs),
+        groups_section=render_groups_section(data["groups"])
     )
 
     os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
@@ -0,0 +1,117 @@
+import os
+import re
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+import pytest
+from PIL import Image
+
+from mmprofiler import MMProfiler
+from mmprofiler.detectors_image import HEADER_PROBE_BYTES
+
+W, H = 1200, 900
+
+
+class RangeHandler(SimpleHTTPRequestHandler):
+    """Віддає файли з directory; підтримує одиночний "Range: bytes=a-b", якщо ignore_range=False."""
+    ignore_range = False
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+        with open(path, "rb") as f:
+            data = f.read()
+        m = re.match(r"bytes=(\d+)-(\d+)", self.headers.get("Range") or "")
+        if m and not self.ignore_range:
+            start, end = int(m.group(1)), min(int(m.group(2)), len(data) - 1)
+            body = data[start:end + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+        else:
+            body = data
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def _serve(directory, ignore_range):
+    handler = type("Handler", (RangeHandler,), {"ignore_range": ignore_range})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), lambda *a: handler(*a, directory=str(directory)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture(scope="module")
+def images(tmp_path_factory):
+    d = tmp_path_factory.mktemp("imgs")
+    pixels = np.random.default_rng(0).integers(0, 255, (H, W, 3), dtype=np.uint8)
+    img = Image.fromarray(pixels)
+    exif = Image.Exif()
+    exif[0x010E] = "x" * 30000  # APP1 ~30 KB: SOF далеко за першими HEADER_PROBE_BYTES
+    files = {
+        "img.png": ("PNG", lambda p: img.save(p, "PNG")),
+        "img.gif": ("GIF", lambda p: img.save(p, "GIF")),
+        "vp8.webp": ("WEBP", lambda p: img.save(p, "WEBP")),
+        "vp8l.webp": ("WEBP", lambda p: img.save(p, "WEBP", lossless=True)),
+        "vp8x.webp": ("WEBP", lambda p: img.convert("RGBA").save(p, "WEBP")),
+        "baseline.jpg": ("JPEG", lambda p: img.save(p, "JPEG")),
+        "progressive.jpg": ("JPEG", lambda p: img.save(p, "JPEG", progressive=True)),
+        "exif.jpg": ("JPEG", lambda p: img.save(p, "JPEG", exif=exif)),
+    }
+    for name, (_, save) in files.items():
+        save(d / name)
+    return d, {name: fmt for name, (fmt, _) in files.items()}
+
+
+def _profile(directory, names, ignore_range):
+    server = _serve(directory, ignore_range)
+    try:
+        base = f"http://127.0.0.1:{server.server_address[1]}/"
+        df = pd.DataFrame({"url": [base + n for n in names]})
+        return MMProfiler(df).analyze_images("url", pixel_stats=False)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _expected_formats(formats):
+    counts = {}
+    for fmt in formats.values():
+        counts[fmt] = counts.get(fmt, 0) + 1
+    return counts
+
+
+def test_range_probe_reads_only_headers(images):
+    directory, formats = images
+    info = _profile(directory, list(formats), ignore_range=False)
+
+    assert info["formats"] == _expected_formats(formats)
+    assert info["widths"] == [W] * len(formats)
+    assert info["heights"] == [H] * len(formats)
+    # по одному Range-запиту на файл + один докачаний сегмент для JPEG з великим APP1
+    assert info["bytes_downloaded"] == HEADER_PROBE_BYTES * (len(formats) + 1)
+    total = sum(os.path.getsize(directory / n) for n in formats)
+    assert total / info["bytes_downloaded"] >= 100
+
+
+def test_server_ignoring_range(images):
+    directory, formats = images
+    info = _profile(directory, list(formats), ignore_range=True)
+
+    assert info["formats"] == _expected_formats(formats)
+    assert info["widths"] == [W] * len(formats)
+    assert info["heights"] == [H] * len(formats)
+    # 200 замість 206: читається лише початок потоку, повний GET — тільки для exif.jpg
+    expected = HEADER_PROBE_BYTES * len(formats) + os.path.getsize(directory / "exif.jpg")
+    assert info["bytes_downloaded"] == expected